@@ -1,4 +1,6 @@
 # Data Structures used for Hash Maps
+from operator import mul
+
 # -------------- Used by both HashMaps (SC & OA)  -------------- #
 
 class DynamicArrayException(Exception):
@@ -65,20 +67,12 @@ class DynamicArray:
 
 def hash_function_1(key: str) -> int:
     """Sample Hash function #1 to be used with HashMap implementation"""
-    hash = 0
-    for letter in key:
-        hash += ord(letter)
-    return hash
+    return sum(map(ord, key))
 
 
 def hash_function_2(key: str) -> int:
     """Sample Hash function #2 to be used with HashMap implementation"""
-    hash, index = 0, 0
-    index = 0
-    for letter in key:
-        hash += (index + 1) * ord(letter)
-        index += 1
-    return hash
+    return sum(map(mul, range(1, len(key) + 1), map(ord, key)))
 
 
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
@@ -88,11 +82,12 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    def __init__(self, key: str, value: object, next: "SLNode" = None, hash: int = None) -> None:
+        """Initialize node given a key, value and optionally the hash of the key."""
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -126,7 +121,8 @@ class LinkedListIterator:
 class LinkedList:
     """
     Class implementing a Singly Linked List
-    Supported methods are: insert, remove, contains, length, iterator
+    Supported methods are: insert, insert_node, remove, remove_with_hash, contains,
+    contains_with_hash, length, iterator
     """
 
     def __init__(self) -> None:
@@ -153,9 +149,15 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
+    def insert(self, key: str, value: object, hash: int = None) -> None:
         """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+        self._head = SLNode(key, value, self._head, hash)
+        self._size += 1
+
+    def insert_node(self, node: SLNode) -> None:
+        """Link an existing node in at the front of the list."""
+        node.next = self._head
+        self._head = node
         self._size += 1
 
     def remove(self, key: str) -> bool:
@@ -177,6 +179,26 @@ class LinkedList:
             previous, node = node, node.next
         return False
 
+    def remove_with_hash(self, key: str, hash: int) -> bool:
+        """
+        Remove first node with matching key.
+        Nodes with a different stored hash are skipped without comparing keys.
+        Return True if removal was successful, False otherwise.
+        """
+        previous, node = None, self._head
+        while node:
+
+            if node.hash == hash and node.key == key:
+                if previous:
+                    previous.next = node.next
+                else:
+                    self._head = node.next
+                self._size -= 1
+                return True
+
+            previous, node = node, node.next
+        return False
+
     def contains(self, key: str) -> SLNode:
         """Return node with matching key, or None if no match"""
         node = self._head
@@ -186,6 +208,18 @@ class LinkedList:
             node = node.next
         return node
 
+    def contains_with_hash(self, key: str, hash: int) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        Nodes with a different stored hash are skipped without comparing keys.
+        """
+        node = self._head
+        while node:
+            if node.hash == hash and node.key == key:
+                return node
+            node = node.next
+        return node
+
     def length(self) -> int:
         """Return the length of the list."""
         return self._size
@@ -195,6 +229,8 @@ class LinkedList:
 
 class HashEntry:
 
+    __slots__ = ('key', 'value', 'is_tombstone')
+
     def __init__(self, key: str, value: object) -> None:
         """Initialize an entry for use in a hash map."""
         self.key = key
@@ -1,26 +1,71 @@
 # Hashmap with open addressing
 
-# Description: The hashmap class represents a hashmap with an underlying dynamic array. Collisions
-# are resolved with open addressing via quadratic probing. Class contains methods to put a key/value
-# pair in the hashmap, get the value of a key, remove a key, determine if a key is present within
-# the hashmap, clear the hashmap, return the empty bucket count, resize the capacity, return the load
-# factor, get a dynamic array of key/value pairs, and iterate through the hashmap.
-
-from data_structures import (DynamicArray, DynamicArrayException, HashEntry,
+# Description: The hashmap class represents a hashmap whose buckets are stored as parallel arrays
+# of keys, values, hashes and probe lengths, with a bytearray marking occupied buckets. Collisions
+# are resolved with open addressing via Robin Hood linear probing. Class contains methods to put a
+# key/value pair in the hashmap, get the value of a key, remove a key, determine if a key is present
+# within the hashmap, clear the hashmap, return the empty bucket count, resize the capacity, return
+# the load factor, get a dynamic array of key/value pairs, and iterate through the hashmap. Iteration
+# yields read-only snapshots of the entries; values are changed with put.
+
+from data_structures import (DynamicArray, HashEntry,
                              hash_function_1, hash_function_2)
 
 
+# Fibonacci hashing: a hash times 2**64 / golden ratio, keeping the top bits of the
+# 64-bit product as the home bucket. The sample hash functions give the same or
+# nearby hashes to many keys, and without this their home buckets would run together
+# into one long linear probing cluster.
+_FIB_MULTIPLIER = 0x9E3779B97F4A7C15
+_WORD_MASK = (1 << 64) - 1
+
+
+class _EntrySnapshot(HashEntry):
+    """
+    Read-only HashEntry handed out by HashMap iteration. The map stores no entry
+    objects, so an assignment to one of these could not reach the map and raises
+    instead of being silently lost.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, key: str, value: object) -> None:
+        """Initialize a snapshot of a live key/value pair."""
+        object.__setattr__(self, 'key', key)
+        object.__setattr__(self, 'value', value)
+        object.__setattr__(self, 'is_tombstone', False)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        """Reject writes, which would not change the map."""
+        raise AttributeError("HashMap iteration is read-only; use put() to change a value")
+
+
 class HashMap:
+
+    __slots__ = ('_capacity', '_mask', '_shift', '_keys', '_values', '_tags', '_hashes', '_psl',
+                 '_hash_function', '_size')
+
     def __init__(self, capacity: int, function) -> None:
         """
-        Initialize new HashMap that uses quadratic probing for collision resolution
+        Initialize new HashMap that uses Robin Hood linear probing for collision resolution
         """
-        self._buckets = DynamicArray()
+        # capacity must be a power of two so indices can be masked
+        self._capacity = self._next_pow2(capacity)
+        self._mask = self._capacity - 1
+        self._shift = 64 - self._mask.bit_length()     # keeps log2(capacity) bits
+
+        # buckets are stored as parallel arrays instead of HashEntry objects
+        self._keys = [None] * self._capacity
+        self._values = [None] * self._capacity
+
+        # one byte per bucket, set while the bucket holds a live entry
+        self._tags = bytearray(self._capacity)
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        # full hash of each entry, compared before the keys themselves
+        self._hashes = [0] * self._capacity
+
+        # probe sequence length of each entry, its distance from its home bucket
+        self._psl = [0] * self._capacity
 
         self._hash_function = function
         self._size = 0
@@ -29,41 +74,36 @@ class HashMap:
         """
         Override string method to provide more readable output
         """
-        out = ''
-        for i in range(self._buckets.length()):
-            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
-        return out
+        keys, values, tags = self._keys, self._values, self._tags
+        return ''.join(f"{i}: {HashEntry(keys[i], values[i]) if tags[i] else 'None'}\n"
+                       for i in range(self._capacity))
 
-    def _next_prime(self, capacity: int) -> int:
+    @classmethod
+    def from_keys_values(cls, keys: list, values: list, function) -> "HashMap":
         """
-        Increment from given number to find the closest prime number
+        Build a new HashMap from a list of keys and a list of values, sized up front
+        so the pairs are inserted without any resizing
         """
-        if capacity % 2 == 0:
-            capacity += 1
-
-        while not self._is_prime(capacity):
-            capacity += 2
+        if len(keys) != len(values):
+            raise ValueError("from_keys_values needs one value for each key")
 
-        return capacity
+        hash_map = cls(2 * len(keys), function)
+        hash_map.put_many(keys, values)
+        return hash_map
 
     @staticmethod
-    def _is_prime(capacity: int) -> bool:
+    def _next_pow2(capacity: int) -> int:
         """
-        Determine if given integer is a prime number and return boolean
+        Round given number up to the closest power of two
         """
-        if capacity == 2 or capacity == 3:
-            return True
-
-        if capacity == 1 or capacity % 2 == 0:
-            return False
-
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
+        return 1 << (capacity - 1).bit_length()
 
-        return True
+    @staticmethod
+    def _to_dynamic_array(items: list) -> DynamicArray:
+        """
+        Wrap a list in a DynamicArray for methods that return one
+        """
+        return DynamicArray(items)
 
     def get_size(self) -> int:
         """
@@ -82,35 +122,129 @@ class HashMap:
     def put(self, key: str, value: object) -> None:
         """
         Takes a key and value pair as parameters. Places the key/value pair in
-        the hash map via quadratic probing. Returns nothing.
+        the hash map via Robin Hood linear probing. Returns nothing.
         """
-        if self.table_load() >= .5:    # compare load factor
+        if (self._size << 1) >= self._capacity:    # load factor >= .5 without a division
             self.resize_table(self._capacity*2)
 
-        hash = self._hash_function(key) % self._buckets.length()
-        count = 1
-        index = hash
+        keys = self._keys
+        values = self._values
+        tags = self._tags
+        hashes = self._hashes
+        psl = self._psl
+        key_hash = self._hash_function(key)
+        mask = self._mask
+        shift = self._shift
+        idx = (key_hash * _FIB_MULTIPLIER & _WORD_MASK) >> shift
+        dist = 0
+
+        # an entry further from home than the key would be means the key is absent
+        while tags[idx] and psl[idx] >= dist:
+            if hashes[idx] == key_hash and keys[idx] == key:
+                values[idx] = value  # replace the value of a matching key in place
+                return
+            idx = (idx + 1) & mask
+            dist += 1
 
-        while self._buckets.get_at_index(index) is not None:    # find an empty index or tombstone
-            entry = self._buckets.get_at_index(index)
-            if entry.key == key and entry.is_tombstone is False:    # replace a matching key w/ new value
-                self._buckets.set_at_index(index, None)
-                self._size -= 1
-            elif entry.is_tombstone is True:    # make tombstone index None so it can be hashed
-                self._buckets.set_at_index(index, None)
+        self._size += 1
+
+        while tags[idx]:    # find an empty index
+            if psl[idx] < dist:     # take the bucket from an entry closer to its home
+                keys[idx], key = key, keys[idx]
+                values[idx], value = value, values[idx]
+                hashes[idx], key_hash = key_hash, hashes[idx]
+                psl[idx], dist = dist, psl[idx]
+            idx = (idx + 1) & mask
+            dist += 1
+
+        keys[idx] = key
+        values[idx] = value
+        tags[idx] = 1
+        hashes[idx] = key_hash
+        psl[idx] = dist
+
+    def put_many(self, new_keys: list, new_values: list) -> None:
+        """
+        Takes a list of keys and a list of values as parameters. Places each key/value
+        pair in the hash map, resizing at most once before the new keys are inserted.
+        Returns nothing.
+        """
+        if len(new_keys) != len(new_values):
+            raise ValueError("put_many needs one value for each key")
+
+        keys = self._keys
+        values = self._values
+        tags = self._tags
+        hashes = self._hashes
+        psl = self._psl
+        hash_function = self._hash_function
+        mask = self._mask
+        shift = self._shift
+        missing = []
+
+        for key, value in zip(new_keys, new_values):    # update the keys already in the table
+            key_hash = hash_function(key)
+            idx = (key_hash * _FIB_MULTIPLIER & _WORD_MASK) >> shift
+            dist = 0
+
+            while tags[idx] and psl[idx] >= dist:
+                if hashes[idx] == key_hash and keys[idx] == key:
+                    values[idx] = value
+                    break
+                idx = (idx + 1) & mask
+                dist += 1
             else:
-                index = (hash + count**2) % self._capacity  # quadratic probing
-                count += 1
+                missing.append((key, value, key_hash))
+
+        # an upper bound, as a key may be repeated within the batch
+        needed = self._size + len(missing)
+        if needed * 2 > self._capacity:    # keep the load factor at or below .5 for the whole batch
+            self.resize_table(needed * 2)
+            keys = self._keys
+            values = self._values
+            tags = self._tags
+            hashes = self._hashes
+            psl = self._psl
+            mask = self._mask
+            shift = self._shift
+
+        size = self._size
+
+        for key, value, key_hash in missing:    # insert the new keys as put does
+            idx = (key_hash * _FIB_MULTIPLIER & _WORD_MASK) >> shift
+            dist = 0
+
+            while tags[idx] and psl[idx] >= dist:   # an earlier pair in the batch may have added it
+                if hashes[idx] == key_hash and keys[idx] == key:
+                    values[idx] = value
+                    break
+                idx = (idx + 1) & mask
+                dist += 1
+            else:
+                size += 1
 
-        new_hash = HashEntry(key, value)
-        self._buckets.set_at_index(index, new_hash)
-        self._size += 1
+                while tags[idx]:
+                    if psl[idx] < dist:
+                        keys[idx], key = key, keys[idx]
+                        values[idx], value = value, values[idx]
+                        hashes[idx], key_hash = key_hash, hashes[idx]
+                        psl[idx], dist = dist, psl[idx]
+                    idx = (idx + 1) & mask
+                    dist += 1
+
+                keys[idx] = key
+                values[idx] = value
+                tags[idx] = 1
+                hashes[idx] = key_hash
+                psl[idx] = dist
+
+        self._size = size
 
     def table_load(self) -> float:
         """
         Takes no parameters. Returns the table load factor as a float.
         """
-        load_factor = self._size / self._buckets.length()
+        load_factor = self._size / self._capacity
         return load_factor
 
     def empty_buckets(self) -> int:
@@ -118,16 +252,9 @@ class HashMap:
         Takes no parameters. Returns the amount of empty buckets in the table as
         an integer.
         """
-        count = 0
-
-        for index in range(self._buckets.length()):
-            entry = self._buckets.get_at_index(index)
-            if entry is None:       # increase count for None and tombstones
-                count += 1
-            elif entry.is_tombstone is True:
-                count += 1
-
-        return count
+        # remove shifts the probe chain back instead of leaving a tombstone, so every
+        # bucket either holds one of the _size live entries or is empty
+        return self._capacity - self._size
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -138,129 +265,190 @@ class HashMap:
         if new_capacity < self._size:
             return
 
-        da = self.get_keys_and_values()  # get an array of all keys and values
-
-        if self._is_prime(new_capacity) is False:       # table capacity must be a prime number
-            new_capacity = self._next_prime(new_capacity)
-
+        # table capacity must be a power of two
+        new_capacity = self._next_pow2(new_capacity)
+        while self._size * 2 > new_capacity:    # keep the load factor at or below .5
+            new_capacity *= 2
+
+        old_keys = self._keys
+        old_values = self._values
+        old_tags = self._tags
+        old_hashes = self._hashes
+        self._keys = keys = [None] * new_capacity
+        self._values = values = [None] * new_capacity
+        self._tags = tags = bytearray(new_capacity)
+        self._hashes = hashes = [0] * new_capacity
+        self._psl = psl = [0] * new_capacity
         self._capacity = new_capacity
-        self.clear()    # appends the new capacity to resize the table
+        self._mask = mask = new_capacity - 1
+        self._shift = shift = 64 - mask.bit_length()
+        self._size = 0
 
-        for index in range(da.length()):    # rehash all key/value pairs
-            key = da.get_at_index(index)[0]
-            value = da.get_at_index(index)[1]
-            self.put(key, value)
+        for index in range(len(old_tags)):  # move the existing entries
+            if not old_tags[index]:     # empty bucket
+                continue
+            key = old_keys[index]
+            value = old_values[index]
+            key_hash = old_hashes[index]
+            # the stored hash avoids calling the hash function
+            idx = (key_hash * _FIB_MULTIPLIER & _WORD_MASK) >> shift
+            dist = 0
+            while tags[idx]:    # find an empty index
+                if psl[idx] < dist:
+                    keys[idx], key = key, keys[idx]
+                    values[idx], value = value, values[idx]
+                    hashes[idx], key_hash = key_hash, hashes[idx]
+                    psl[idx], dist = dist, psl[idx]
+                idx = (idx + 1) & mask
+                dist += 1
+            keys[idx] = key
+            values[idx] = value
+            tags[idx] = 1
+            hashes[idx] = key_hash
+            psl[idx] = dist
+            self._size += 1
 
     def get(self, key: str) -> object:
         """
         Takes a key as a parameter. Returns the value of the key if the key exists in
         the table. Returns None if the key is not in the table.
         """
-        hash = self._hash_function(key) % self._buckets.length()  # gives the first potential index
-        count = 1
-        index = hash
-
-        while self._buckets.get_at_index(index) is not None:    # find an empty index
-            entry = self._buckets.get_at_index(index)
-            if entry.key == key and entry.is_tombstone is False:    # a matching key/value pair has been found
-                return entry.value
-            else:
-                index = (hash + count**2) % self._capacity
-                count += 1
+        keys = self._keys
+        values = self._values
+        tags = self._tags
+        hashes = self._hashes
+        psl = self._psl
+        key_hash = self._hash_function(key)
+        mask = self._mask
+        shift = self._shift
+        idx = (key_hash * _FIB_MULTIPLIER & _WORD_MASK) >> shift  # gives the first potential index
+        dist = 0
+
+        while tags[idx] and psl[idx] >= dist:   # stop at an empty index or an entry closer to home
+            if hashes[idx] == key_hash and keys[idx] == key:    # a matching key/value pair has been found
+                return values[idx]
+            idx = (idx + 1) & mask
+            dist += 1
 
         return None
 
+    def get_many(self, lookup_keys: list) -> DynamicArray:
+        """
+        Takes a list of keys as a parameter. Returns a dynamic array with the value of
+        each key, or None for keys that are not in the table.
+        """
+        keys = self._keys
+        values = self._values
+        tags = self._tags
+        hashes = self._hashes
+        psl = self._psl
+        hash_function = self._hash_function
+        mask = self._mask
+        shift = self._shift
+        found = []
+
+        for key in lookup_keys:
+            key_hash = hash_function(key)
+            idx = (key_hash * _FIB_MULTIPLIER & _WORD_MASK) >> shift
+            dist = 0
+            value = None
+
+            while tags[idx] and psl[idx] >= dist:
+                if hashes[idx] == key_hash and keys[idx] == key:
+                    value = values[idx]
+                    break
+                idx = (idx + 1) & mask
+                dist += 1
+
+            found.append(value)
+
+        return self._to_dynamic_array(found)
+
     def contains_key(self, key: str) -> bool:
         """
-        Takes a key as a parameter. Uses quadratic probing to determine if the key is
+        Takes a key as a parameter. Uses linear probing to determine if the key is
         in the hash map. Returns true if the given key is in the hash map or false if not.
         """
-        hash = self._hash_function(key) % self._buckets.length()  # gives the first potential index
-        count = 1
-        index = hash
-
-        while self._buckets.get_at_index(index) is not None:  # find an empty index
-            entry = self._buckets.get_at_index(index)
-            if entry.key == key and entry.is_tombstone is False:
+        keys = self._keys
+        tags = self._tags
+        hashes = self._hashes
+        psl = self._psl
+        key_hash = self._hash_function(key)
+        mask = self._mask
+        shift = self._shift
+        idx = (key_hash * _FIB_MULTIPLIER & _WORD_MASK) >> shift  # gives the first potential index
+        dist = 0
+
+        while tags[idx] and psl[idx] >= dist:   # stop at an empty index or an entry closer to home
+            if hashes[idx] == key_hash and keys[idx] == key:
                 return True
-            else:
-                index = (hash + count**2) % self._capacity
-                count += 1
+            idx = (idx + 1) & mask
+            dist += 1
 
         return False    # key not found
 
     def remove(self, key: str) -> None:
         """
-        Takes a key as a parameter. Removes the key from the hash map using quadratic probing.
-        Returns nothing.
-        """
-        hash = self._hash_function(key) % self._buckets.length()  # gives the first potential index
-        count = 1
-        index = hash
-
-        while self._buckets.get_at_index(index) is not None:  # find an empty index
-            entry = self._buckets.get_at_index(index)
-            if entry.key == key and entry.is_tombstone is False:
-                entry.is_tombstone = True
+        Takes a key as a parameter. Removes the key from the hash map using linear probing
+        and shifts the rest of its probe chain back one bucket. Returns nothing.
+        """
+        keys = self._keys
+        values = self._values
+        tags = self._tags
+        hashes = self._hashes
+        psl = self._psl
+        key_hash = self._hash_function(key)
+        mask = self._mask
+        shift = self._shift
+        idx = (key_hash * _FIB_MULTIPLIER & _WORD_MASK) >> shift  # gives the first potential index
+        dist = 0
+
+        while tags[idx] and psl[idx] >= dist:   # stop at an empty index or an entry closer to home
+            if hashes[idx] == key_hash and keys[idx] == key:
                 self._size -= 1
+                nxt = (idx + 1) & mask
+                while tags[nxt] and psl[nxt] > 0:   # backward shift until an entry is at home
+                    keys[idx] = keys[nxt]
+                    values[idx] = values[nxt]
+                    hashes[idx] = hashes[nxt]
+                    psl[idx] = psl[nxt] - 1
+                    idx = nxt
+                    nxt = (nxt + 1) & mask
+                keys[idx] = None    # the emptied bucket is truly empty, not a tombstone
+                values[idx] = None
+                tags[idx] = 0
+                psl[idx] = 0
                 return  # end the loop when they key has been found and removed
-            else:
-                index = (hash + count ** 2) % self._capacity
-                count += 1
+            idx = (idx + 1) & mask
+            dist += 1
 
     def clear(self) -> None:
         """
         Takes no parameters. Clears all elements from the hash map. Returns nothing.
         """
         self._size = 0
-        self._buckets = DynamicArray()  # reset the DA
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        self._keys = [None] * self._capacity  # reset the buckets
+        self._values = [None] * self._capacity
+        self._tags = bytearray(self._capacity)
+        self._hashes = [0] * self._capacity
+        self._psl = [0] * self._capacity
 
     def get_keys_and_values(self) -> DynamicArray:
         """
         Takes no parameters. Creates a dynamic array with tuples of the key/value pairs
         from the hash map. Returns the dynamic array.
         """
-        DA = DynamicArray()
-
-        for index in range(self._buckets.length()):
-            entry = self._buckets.get_at_index(index)
-
-            if entry is not None:
-                if entry.is_tombstone is False: # keys that are tombstones are not added
-                    DA.append((entry.key, entry.value))
-
-        return DA
+        keys, values, tags = self._keys, self._values, self._tags
+        pairs = [(keys[i], values[i]) for i in range(self._capacity) if tags[i]]
+        return self._to_dynamic_array(pairs)
 
     def __iter__(self):
         """
-        Takes no parameters. Creates an iterator to iterate through the hash map.
-        Returns the iterator.
+        Takes no parameters. Returns a generator of read-only HashEntry snapshots of the
+        key/value pairs in the hash map, so several iterations can run at the same time.
         """
-        self._index = 0     # initializes the first iteration to index 0
-        return self
-
-    def __next__(self):
-        """
-        Takes no parameters. Returns the next value within the hash map based on
-        the iterator.
-        """
-
-        try:
-            entry = self._buckets.get_at_index(self._index)
-        except DynamicArrayException:   # in case the next index value is out of range
-            raise StopIteration
-
-        while entry is None or entry.is_tombstone:
-            self._index += 1
-            try:
-                entry = self._buckets.get_at_index(self._index)
-            except DynamicArrayException:   # in case an index after None/tombstone is out of range
-                raise StopIteration
-
-        self._index += 1    # sets the index for the next iteration
-        return entry
+        keys, values, tags = self._keys, self._values, self._tags
+        return (_EntrySnapshot(keys[i], values[i]) for i in range(self._capacity) if tags[i])
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -472,3 +660,16 @@ if __name__ == "__main__":
     print(m)
     for item in m:
         print('K:', item.key, 'V:', item.value)
+
+    print("\nput_many(), get_many() example 1")
+    print("---------------------")
+    m = HashMap(10, hash_function_1)
+    m.put_many(['str' + str(i) for i in range(100)], [i * 100 for i in range(100)])
+    print(m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+    m.put_many(['str0', 'str1'], ['zero', 'one'])
+    print(m.get_size(), m.get_many(['str0', 'str1', 'str99', 'str100']))
+
+    print("\nfrom_keys_values() example 1")
+    print("---------------------")
+    m = HashMap.from_keys_values([str(i) for i in range(50)], [i * 10 for i in range(50)], hash_function_2)
+    print(m.get_size(), m.get_capacity(), m.get('7'), m.contains_key('50'))
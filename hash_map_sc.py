@@ -1,51 +1,76 @@
 # Hashmap with separate chaining
 
-# Description: The hashmap class represents a hashmap with an underlying dynamic array. Collisions
-# are resolved with chaining via a singly linked list. Class contains methods to put a key/value
-# pair in the hashmap, get the value of a key, remove a key, determine if a key is present within
-# the hashmap, clear the hashmap, return the empty bucket count, resize the capacity, return the load
-# factor, and get a dynamic array of key/value pairs. A function is available to find the mode of
-# a given dynamic array.
+# Description: The hashmap class represents a hashmap whose buckets are a Python list of linked
+# lists. Collisions are resolved with chaining via a singly linked list. Class contains methods to
+# put a key/value pair in the hashmap, get the value of a key, remove a key, determine if a key is
+# present within the hashmap, clear the hashmap, return the empty bucket count, resize the capacity,
+# return the load factor, and get a dynamic array of key/value pairs. A function is available to
+# find the mode of a given dynamic array.
 
 
+from bisect import bisect_left
+from math import ceil, isqrt
+
 from data_structures import (DynamicArray, LinkedList,
                              hash_function_1, hash_function_2)
 
 
+def _odd_primes(limit: int) -> tuple:
+    """
+    Sieve of Eratosthenes. Returns the odd primes below the given limit in order.
+    """
+    sieve = bytearray([1]) * limit
+    sieve[0:2] = b'\x00\x00'
+    for n in range(2, isqrt(limit - 1) + 1):
+        if sieve[n]:
+            sieve[n * n::n] = bytes(len(range(n * n, limit, n)))
+    return tuple(n for n in range(3, limit, 2) if sieve[n])
+
+
+# capacities up to this table are looked up instead of found by trial division
+_PRIMES = _odd_primes(1 << 16)
+
+
 class HashMap:
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 max_load: float = 0.8) -> None:
         """
         Initialize new HashMap that uses
         separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        self._buckets = DynamicArray()
+        if max_load <= 0:   # resize_table could never reach a capacity that satisfies it
+            raise ValueError("max_load must be greater than 0")
 
         # capacity must be a prime number
         self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+        self._buckets = [LinkedList() for _ in range(self._capacity)]
+
+        # put resizes the table once the load factor reaches max_load
+        self._max_load = max_load
+        self._resize_threshold = ceil(max_load * self._capacity)
 
         self._hash_function = function
         self._size = 0
+        self._used_buckets = 0  # buckets holding at least one node
 
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
         out = ''
-        for i in range(self._buckets.length()):
+        for i in range(len(self._buckets)):
             out += str(i) + ': ' + str(self._buckets[i]) + '\n'
         return out
 
     def _next_prime(self, capacity: int) -> int:
         """
         Increment from given number and the find the closest prime number
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
+        if capacity <= _PRIMES[-1]:     # the table skips 2, as the search below does
+            return _PRIMES[bisect_left(_PRIMES, capacity)]
+
         if capacity % 2 == 0:
             capacity += 1
 
@@ -58,19 +83,16 @@ class HashMap:
     def _is_prime(capacity: int) -> bool:
         """
         Determine if given integer is a prime number and return boolean
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity == 2 or capacity == 3:
-            return True
+        if capacity <= _PRIMES[-1]:
+            return capacity == 2 or _PRIMES[bisect_left(_PRIMES, capacity)] == capacity
 
-        if capacity == 1 or capacity % 2 == 0:
+        if capacity % 2 == 0:   # even numbers past the table are not prime
             return False
 
-        factor = 3
-        while factor ** 2 <= capacity:
+        for factor in range(3, isqrt(capacity) + 1, 2):    # odd factors up to the square root
             if capacity % factor == 0:
                 return False
-            factor += 2
 
         return True
 
@@ -95,49 +117,49 @@ class HashMap:
         Takes a key and value pair as parameters. Places the key/value pair in
         the hash map. Returns nothing.
         """
-        if self.table_load() >= 1:    # double the capacity based on the load factor
+        self._put_with_hash(key, value, self._hash_function(key))
+
+    def _put_with_hash(self, key: str, value: object, hash: int) -> None:
+        """
+        Same as put, for a key whose hash has already been computed
+        """
+        if self._size >= self._resize_threshold:    # double the capacity based on the load factor
             self.resize_table(self._capacity*2)
 
-        hash = self._hash_function(key)  # gives the bucket index
-        index = hash % self._buckets.length()
-        linked_list = self._buckets.get_at_index(index)
+        index = hash % self._capacity   # gives the bucket index
+        linked_list = self._buckets[index]
 
-        if linked_list.contains(key) is not None:
-            self._size -= 1
-            linked_list.remove(key)     # remove the node to update the value
+        node = linked_list.contains_with_hash(key, hash)
+        if node is not None:    # update the value of the matching node in place
+            node.value = value
+            return
 
         self._size += 1
-        linked_list.insert(key, value)
+        if linked_list.length() == 0:   # the first node in this bucket
+            self._used_buckets += 1
+        linked_list.insert(key, value, hash)    # the node keeps the hash for later lookups
 
     def empty_buckets(self) -> int:
         """
         Takes no parameters. Returns the amount of empty buckets in the hash map as
         an integer.
         """
-        count = 0
-
-        for index in range(self._buckets.length()):
-            linked_list = self._buckets.get_at_index(index)
-            if linked_list.length() == 0:  # an empty bucket has an empty linked list
-                count += 1
-
-        return count
+        return self._capacity - self._used_buckets     # every other bucket has an empty linked list
 
     def table_load(self) -> float:
         """
         Takes no parameters. Returns the table load factor as a float.
         """
-        load_factor = self._size / self._buckets.length()
+        load_factor = self._size / self._capacity
         return load_factor
 
     def clear(self) -> None:
         """
         Takes no parameters. Clears all element from the hash map. Returns nothing.
         """
-        self._buckets = DynamicArray() # reset DA and size
+        self._buckets = [LinkedList() for _ in range(self._capacity)]  # reset buckets and size
         self._size = 0
-        for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+        self._used_buckets = 0
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -147,49 +169,59 @@ class HashMap:
         """
         if new_capacity < 1:
             return
-        DA = self.get_keys_and_values()     # get a DA of all key/value pairs
-
         if self._is_prime(new_capacity) is False:  # capacity must be prime
             new_capacity = self._next_prime(new_capacity)
+        while self._size > new_capacity * self._max_load:   # stay within the load factor put allows
+            new_capacity = self._next_prime(new_capacity * 2)
 
-        self._capacity = new_capacity
-        self.clear()        # updates the table with the new capacity
+        new_buckets = [LinkedList() for _ in range(new_capacity)]
+        used_buckets = 0
+
+        for linked_list in self._buckets:   # move every node using its stored hash
+            for node in linked_list:
+                bucket = new_buckets[node.hash % new_capacity]
+                if bucket.length() == 0:
+                    used_buckets += 1
+                bucket.insert_node(node)
 
-        for index in range(DA.length()):    # rehash all key/value pairs
-            key = DA.get_at_index(index)[0]
-            value = DA.get_at_index(index)[1]
-            self.put(key, value)
+        self._buckets = new_buckets
+        self._used_buckets = used_buckets
+        self._capacity = new_capacity
+        self._resize_threshold = ceil(self._max_load * new_capacity)
 
     def get(self, key: str):
         """
         Takes a key as a parameter. Returns the value of the key if the key exists in
         the table. Returns None if the key is not in the table.
         """
-        hash = self._hash_function(key)
-        index = hash % self._buckets.length()
-        linked_list = self._buckets.get_at_index(index)
+        return self._get_with_hash(key, self._hash_function(key))
 
-        if linked_list.contains(key):
-            node = linked_list.contains(key)    # gives the node within the linked list
-            return node.value
+    def _get_with_hash(self, key: str, hash: int):
+        """
+        Same as get, for a key whose hash has already been computed
+        """
+        index = hash % self._capacity
+        linked_list = self._buckets[index]
 
-        else:
-            return None     # no matching key was found
+        node = linked_list.contains_with_hash(key, hash)    # gives the node within the linked list
+        return node.value if node is not None else None     # None if no matching key was found
 
     def contains_key(self, key: str) -> bool:
         """
         Takes a key as a parameter.
         Returns true if the given key is in the hash map or false if not.
         """
-        hash = self._hash_function(key)
-        index = hash % self._buckets.length()
-        linked_list = self._buckets.get_at_index(index)
+        return self._contains_with_hash(key, self._hash_function(key))
 
-        if linked_list.contains(key):   # true if the linked list contains the key
-            return True
+    def _contains_with_hash(self, key: str, hash: int) -> bool:
+        """
+        Same as contains_key, for a key whose hash has already been computed
+        """
+        index = hash % self._capacity
+        linked_list = self._buckets[index]
 
-        else:
-            return False
+        # true if the linked list contains the key
+        return linked_list.contains_with_hash(key, hash) is not None
 
     def remove(self, key: str) -> None:
         """
@@ -197,28 +229,21 @@ class HashMap:
         Returns nothing.
         """
         hash = self._hash_function(key)
-        index = hash % self._buckets.length()
-        linked_list = self._buckets.get_at_index(index)
+        index = hash % self._capacity
+        linked_list = self._buckets[index]
 
-        if linked_list.contains(key):
-            linked_list.remove(key)     # removes the node
+        if linked_list.remove_with_hash(key, hash):     # removes the node in the same walk that finds it
             self._size -= 1     # update the size
+            if linked_list.length() == 0:   # that was the last node in this bucket
+                self._used_buckets -= 1
 
     def get_keys_and_values(self) -> DynamicArray:
         """
         Takes no parameters. Creates a dynamic array with tuples of the key/value pairs
         from the hash map. Returns the dynamic array.
         """
-        DA = DynamicArray()
-        for index in range(self._buckets.length()):
-            linked_list = self._buckets.get_at_index(index)
-            if linked_list.length() != 0:   # iterates through the linked list
-                iterator = linked_list.__iter__()
-                for nodes in range(linked_list.length()):
-                    next_node = iterator.__next__()
-                    DA.append((next_node.key, next_node.value))     # appends each key/value pair
-
-        return DA
+        pairs = [(node.key, node.value) for linked_list in self._buckets for node in linked_list]
+        return DynamicArray(pairs)
 
 
 def hash_function(key: str):
@@ -226,10 +251,7 @@ def hash_function(key: str):
     Takes a key as a parameter. Hashes the key based on its value for placement within a
     hash map. Returns the hash.
     """
-    hash = 0
-    for letter in key:
-        hash += ord(letter)
-    return hash
+    return sum(map(ord, key))   # the sum of the character codes, summed in C
 
 
 def find_mode(da: DynamicArray) -> (DynamicArray, int):
@@ -237,32 +259,26 @@ def find_mode(da: DynamicArray) -> (DynamicArray, int):
     Takes a dynamic array as a parameter. Find the mode(s) and frequency of the given
     dynamic array. Returns a new dynamic array with the mode(s) and returns the frequency.
     """
-    mode = DynamicArray()   # a new DA holds the mode(s)
-    count = 0   # counts the frequency
     map = HashMap(11, hash_function)
-    for index in range(da.length()):
+    count = 0   # counts the frequency of the mode
+    for index in range(da.length()):    # count each key and remember where it was last seen
         key = da.get_at_index(index)
-        if map.contains_key(key):   # if the key is in the hash map, it increases the value
-            value = map.get(key)
-            value += 1
-            map.put(key, value)     # the value represents the count
-            if value > count:   # the key has beat the previous mode
-                mode = DynamicArray()
-                mode.append(key)
-                count = value
-            elif value == count:    # the key is equal in count to the mode
-                mode.append(key)
-        else:                       # if the key is not in the hash map, it is hashed with the put method
-            value = 1
-            map.put(key, value)
-            if value > count:       # places the first key in the DA as the mode
-                mode = DynamicArray()
-                mode.append(key)
-                count = value
-            elif value == count:
-                mode.append(key)
-
-    return mode, count
+        hash = hash_function(key)   # hashed once for both map operations
+        seen = map._get_with_hash(key, hash)
+        frequency = 1 if seen is None else seen[0] + 1
+        map._put_with_hash(key, (frequency, index), hash)
+        if frequency > count:   # the key has beat the previous mode
+            count = frequency
+
+    modes = [(node.value[1], node.key)      # one node per distinct key
+             for linked_list in map._buckets
+             for node in linked_list
+             if node.value[0] == count]
+
+    # a mode reaches the top frequency at its last occurrence, so ordering by it
+    # lists the modes in the order they reached that frequency
+    modes.sort()
+    return DynamicArray([key for last, key in modes]), count
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
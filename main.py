@@ -1,8 +1,9 @@
 # Copyright Notice: This code belongs to Audrey Flanders and may not be adapted, copied, or republished under
 # ANY circumstances.
 
-# This program implements HashMaps with collision resolution. Both HashMaps were implemented
-# with underlying dynamic arrays.
-# For the OA HashMap, collisions are resolved with open addressing via quadratic probing.
+# This program implements HashMaps with collision resolution. The OA HashMap stores its buckets
+# in parallel arrays (lists of keys, values, hashes and probe lengths, and a bytearray of occupancy
+# flags). The SC HashMap stores its buckets as a Python list of linked lists.
+# For the OA HashMap, collisions are resolved with open addressing via Robin Hood linear probing.
 # For the SC HashMap, collisions are resolved with chaining via a singly linked list.
 # The SC HashMap was used to find the mode(s) and corresponding frequency for any given dynamic array.